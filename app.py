@@ -9,6 +9,19 @@ from docx.enum.text import WD_COLOR_INDEX
 import pandas as pd
 from docx.shared import Pt
 import zipfile
+import bisect
+import copy
+import difflib
+import hashlib
+import heapq
+import json
+import os
+import threading
+import unicodedata
+import uuid
+from collections import defaultdict
+from docx.text.run import Run
+from docx.oxml.ns import qn
 
 # --- Konfigurasi Awal Halaman ---
 st.set_page_config(
@@ -128,7 +141,10 @@ def extract_text_with_pages(uploaded_file):
     return pages_content
 
 def proofread_with_gemini(text_to_check):
-    """Mengirim teks ke Gemini untuk proofreading dan mem-parsing hasilnya."""
+    """
+    Mengirim teks ke Gemini untuk proofreading dan mem-parsing hasilnya.
+    Mengembalikan None jika AI gagal dihubungi, agar tidak dianggap sebagai teks tanpa kesalahan.
+    """
     if not text_to_check or text_to_check.isspace():
         return []
     
@@ -172,7 +188,7 @@ def proofread_with_gemini(text_to_check):
         return [{"salah": salah.strip(), "benar": benar.strip(), "kalimat": kalimat.strip()} for salah, benar, kalimat, _ in found_errors]
     except Exception as e:
         st.error(f"Terjadi kesalahan saat menghubungi AI: {e}")
-        return []
+        return None
 
 def generate_revised_docx(file_bytes, errors):
     """
@@ -264,6 +280,499 @@ def create_zip_archive(revised_data, highlighted_data, original_filename):
         zip_file.writestr(f"highlight_{original_filename}", highlighted_data)
     return zip_buffer.getvalue()
 
+# --- Fungsi-fungsi Indeks Penanda (Anchor) Dokumen ---
+# Kutipan dari AI (kalimat, teks asli, paragraf) jarang sama persis dengan teks dokumen,
+# jadi posisinya dicari lewat indeks n-gram karakter + MinHash yang dibangun sekali per dokumen.
+
+ANCHOR_NGRAM = 3          # Panjang n-gram karakter
+ANCHOR_MINHASH_BINS = 16  # Jumlah bin MinHash (one-permutation)
+ANCHOR_LSH_ROWS = 2       # Jumlah bin per band LSH
+ANCHOR_RARE_PROBES = 8    # Jumlah n-gram paling jarang yang dipakai untuk mencari kandidat
+ANCHOR_MIN_SCORE = 0.5    # Skor minimum (proporsi n-gram kutipan yang ada di paragraf)
+ANCHOR_CACHE_MAX_ENTRIES = 8      # Jumlah indeks dokumen yang disimpan di cache sekaligus
+ANCHOR_CACHE_TTL_SECONDS = 3600   # Indeks dibuang dari cache setelah 1 jam
+
+def normalize_with_map(text):
+    """
+    Menormalkan teks (huruf kecil, tanpa aksen dan tanda baca, spasi tunggal)
+    dan mengembalikan peta posisi setiap karakter hasil ke posisi di teks asli.
+    """
+    chars, positions = [], []
+    for match in re.finditer(r'[^\W_]+', text or ""):
+        word, offset = match.group(), match.start()
+        if chars:
+            chars.append(" ")
+            positions.append(offset)
+        # Jalur cepat untuk kata ASCII; karakter lain dinormalkan satu per satu (misal huruf beraksen)
+        if word.isascii():
+            chars.append(word.lower())
+            positions.extend(range(offset, offset + len(word)))
+            continue
+        for i, ch in enumerate(word, start=offset):
+            for c in unicodedata.normalize("NFKD", ch):
+                if unicodedata.combining(c):
+                    continue
+                for lower_c in c.lower():
+                    chars.append(lower_c)
+                    positions.append(i)
+    return "".join(chars), positions
+
+def _char_ngrams(norm_text):
+    """Mengembalikan himpunan n-gram karakter dari teks yang sudah dinormalkan."""
+    if len(norm_text) <= ANCHOR_NGRAM:
+        return {norm_text} if norm_text else set()
+    return {norm_text[i:i + ANCHOR_NGRAM] for i in range(len(norm_text) - ANCHOR_NGRAM + 1)}
+
+def _minhash_signature(shingles):
+    """Signature MinHash one-permutation: setiap hash cukup dihitung sekali lalu dibagi ke bin."""
+    signature = [None] * ANCHOR_MINHASH_BINS
+    for shingle in shingles:
+        # hash() bawaan cukup karena indeks hanya hidup di dalam satu proses (cache Streamlit)
+        h = hash(shingle) & 0xFFFFFFFF
+        bin_idx, value = h % ANCHOR_MINHASH_BINS, h // ANCHOR_MINHASH_BINS
+        if signature[bin_idx] is None or value < signature[bin_idx]:
+            signature[bin_idx] = value
+    return signature
+
+def _lsh_keys(signature):
+    """Memecah signature menjadi band LSH. Band dengan bin kosong dilewati."""
+    for band_start in range(0, ANCHOR_MINHASH_BINS, ANCHOR_LSH_ROWS):
+        band = tuple(signature[band_start:band_start + ANCHOR_LSH_ROWS])
+        if None not in band:
+            yield (band_start, band)
+
+def paragraph_run_text(para):
+    """Teks paragraf yang disusun dari runs, agar offset sama dengan posisi saat highlight."""
+    return "".join(run.text for run in para.runs)
+
+def build_anchor_index(paragraph_texts):
+    """
+    Membangun indeks penanda dari daftar teks paragraf: teks ternormalisasi per paragraf
+    dan per kalimat, indeks terbalik n-gram karakter, serta bucket LSH MinHash.
+    """
+    index = {
+        "paragraphs": [],
+        "exact": {},
+        "ngrams": defaultdict(set),
+        "lsh": defaultdict(set),
+    }
+    for para_idx, text in enumerate(paragraph_texts):
+        norm, positions = normalize_with_map(text)
+        shingles = _char_ngrams(norm)
+        index["paragraphs"].append({"norm": norm, "positions": positions, "shingles": shingles})
+        if not norm:
+            continue
+
+        for shingle in shingles:
+            index["ngrams"][shingle].add(para_idx)
+
+        # Kalimat diambil langsung dari teks ternormalkan memakai batas tanda baca di teks asli
+        units = {norm}
+        sentence_start = 0
+        for boundary in re.finditer(r'[.!?;]\s+', text):
+            sentence_end = bisect.bisect_left(positions, boundary.end())
+            units.add(norm[sentence_start:sentence_end].strip())
+            sentence_start = sentence_end
+        units.add(norm[sentence_start:].strip())
+
+        for unit in units:
+            if not unit:
+                continue
+            index["exact"].setdefault(unit, para_idx)
+            unit_shingles = shingles if unit == norm else _char_ngrams(unit)
+            for key in _lsh_keys(_minhash_signature(unit_shingles)):
+                index["lsh"][key].add(para_idx)
+    return index
+
+def _align_span(para_norm, quote_norm):
+    """Mencari rentang [awal, akhir) kutipan di dalam teks paragraf yang sudah dinormalkan."""
+    exact_pos = para_norm.find(quote_norm)
+    if exact_pos != -1:
+        return exact_pos, exact_pos + len(quote_norm)
+
+    matcher = difflib.SequenceMatcher(None, para_norm, quote_norm, autojunk=False)
+    blocks = [b for b in matcher.get_matching_blocks() if b.size >= ANCHOR_NGRAM]
+    if not blocks:
+        return 0, len(para_norm)
+    return blocks[0].a, blocks[-1].a + blocks[-1].size
+
+def locate_quote(index, quote):
+    """
+    Mencari paragraf dan posisi karakter terbaik untuk sebuah kutipan dari AI.
+    Mengembalikan dict {"paragraph", "start", "end", "score"} atau None jika tidak ditemukan.
+    """
+    quote_norm, _ = normalize_with_map(quote)
+    if not quote_norm:
+        return None
+
+    exact_para = index["exact"].get(quote_norm)
+    if exact_para is not None:
+        best_para, best_score = exact_para, 1.0
+    else:
+        shingles = _char_ngrams(quote_norm)
+        candidates = set()
+        for key in _lsh_keys(_minhash_signature(shingles)):
+            candidates |= index["lsh"].get(key, set())
+        known = [shingle for shingle in shingles if shingle in index["ngrams"]]
+        for shingle in heapq.nsmallest(ANCHOR_RARE_PROBES, known, key=lambda sh: len(index["ngrams"][sh])):
+            candidates |= index["ngrams"][shingle]
+
+        best_para, best_key = None, None
+        for para_idx in candidates:
+            para_shingles = index["paragraphs"][para_idx]["shingles"]
+            score = len(shingles & para_shingles) / len(shingles)
+            # Jika skor sama, utamakan paragraf yang lebih pendek (lebih spesifik)
+            key = (score, -len(para_shingles))
+            if best_key is None or key > best_key:
+                best_para, best_key = para_idx, key
+        if best_para is None or best_key[0] < ANCHOR_MIN_SCORE:
+            return None
+        best_score = best_key[0]
+
+    paragraph = index["paragraphs"][best_para]
+    norm_start, norm_end = _align_span(paragraph["norm"], quote_norm)
+    return {
+        "paragraph": best_para,
+        "start": paragraph["positions"][norm_start],
+        "end": paragraph["positions"][norm_end - 1] + 1,
+        "score": round(best_score, 3),
+    }
+
+@st.cache_resource(show_spinner=False, max_entries=ANCHOR_CACHE_MAX_ENTRIES, ttl=ANCHOR_CACHE_TTL_SECONDS)
+def get_anchor_index(file_bytes):
+    """Membangun (dan menyimpan di cache) indeks penanda untuk sebuah file DOCX."""
+    doc = docx.Document(io.BytesIO(file_bytes))
+    return build_anchor_index([paragraph_run_text(para) for para in doc.paragraphs])
+
+PLAIN_RUN_TAGS = {qn("w:rPr"), qn("w:t"), qn("w:tab"), qn("w:lastRenderedPageBreak")}
+
+def _is_plain_text_run(run):
+    """Run yang hanya berisi teks, tab, dan baris baru biasa sehingga aman dipecah."""
+    for child in run._r:
+        if child.tag == qn("w:br") and child.get(qn("w:type")) in (None, "textWrapping"):
+            continue
+        if child.tag not in PLAIN_RUN_TAGS:
+            return False
+    return True
+
+def _split_run(run, offset):
+    """Memecah run menjadi dua pada posisi offset dengan format yang sama. Mengembalikan run kedua."""
+    new_r = copy.deepcopy(run._r)
+    run._r.addnext(new_r)
+    new_run = Run(new_r, run._parent)
+    text = run.text
+    run.text = text[:offset]
+    new_run.text = text[offset:]
+    return new_run
+
+def highlight_paragraph_span(para, start, end):
+    """Memberi highlight kuning pada rentang karakter [start, end) tanpa mengubah format run lainnya."""
+    position = 0
+    for run in list(para.runs):
+        run_text = run.text
+        run_start, run_end = position, position + len(run_text)
+        position = run_end
+        if not run_text or run_end <= start or run_start >= end:
+            continue
+
+        # Run berisi field code, gambar, catatan kaki, dll. tidak dipecah agar isinya tidak hilang;
+        # seluruh run di-highlight
+        if not _is_plain_text_run(run):
+            run.font.highlight_color = WD_COLOR_INDEX.YELLOW
+            continue
+
+        cut_start = max(start, run_start) - run_start
+        cut_end = min(end, run_end) - run_start
+        if cut_end < len(run_text):
+            _split_run(run, cut_end)
+        if cut_start > 0:
+            run = _split_run(run, cut_start)
+        run.font.highlight_color = WD_COLOR_INDEX.YELLOW
+
+def create_anchor_highlight_docx(file_bytes, quotes):
+    """
+    Membuat file DOCX asli dengan highlight pada posisi setiap kutipan temuan AI.
+    Mengembalikan data DOCX dan jumlah kutipan yang berhasil ditemukan di dokumen.
+    """
+    doc = docx.Document(io.BytesIO(file_bytes))
+    index = get_anchor_index(file_bytes)
+
+    located = 0
+    for quote in quotes:
+        location = locate_quote(index, quote)
+        if location:
+            highlight_paragraph_span(doc.paragraphs[location["paragraph"]], location["start"], location["end"])
+            located += 1
+
+    output_buffer = io.BytesIO()
+    doc.save(output_buffer)
+    return output_buffer.getvalue(), located
+
+# --- Fungsi-fungsi Deteksi Boilerplate (Nomor Surat, Penutup, Paragraf Standar) ---
+# Blok nomor surat dan penutup (aturan 8 pada prompt) serta paragraf standar yang sudah
+# lolos proofread di dokumen-dokumen sebelumnya tidak perlu dikirim lagi ke Gemini.
+
+VERIFIED_STORE_PATH = "verified_paragraphs.json"
+VERIFIED_MIN_DOCUMENTS = 2       # Paragraf dianggap standar setelah lolos tanpa kesalahan di minimal 2 dokumen berbeda
+VERIFIED_TTL_DAYS = 90           # Entri yang tidak terlihat lagi selama ini dibuang (paragraf standar dicek ulang)
+VERIFIED_MAX_PARAGRAPHS = 20000  # Batas jumlah hash paragraf yang disimpan
+VERIFIED_MAX_DOCUMENTS = 500     # Batas jumlah dokumen yang diingat
+VERIFIED_MIN_WORDS = 8           # Hanya paragraf kalimat utuh minimal 8 kata yang dicatat dan dilewati
+SAME_DOCUMENT_SIMILARITY = 0.5   # Kemiripan (Jaccard) isi dokumen agar unggahan dianggap dokumen yang sama (misal draf revisi)
+HEADER_SCAN_LINES = 15           # Jumlah baris awal yang diperiksa untuk blok nomor surat
+HEADER_MAX_CONTINUATION = 3      # Jumlah baris lanjutan (misal alamat tujuan) yang boleh menyela isian kop
+CLOSING_SCAN_LINES = 25          # Jumlah baris akhir yang diperiksa untuk blok penutup
+SHORT_LINE_MAX_CHARS = 80        # Panjang maksimum baris lanjutan kop, tanda tangan, dan tembusan
+
+HEADER_FIELD_PATTERN = re.compile(
+    r"^\s*((nomor|no|lampiran|perihal|hal|sifat|tanggal|kepada|dari)\s*\.?\s*:|(kepada\s+)?yth\b)",
+    re.IGNORECASE
+)
+ADDRESSEE_PATTERN = re.compile(r"^\s*(kepada|yth\b)", re.IGNORECASE)
+CLOSING_START_PATTERN = re.compile(
+    r"^\s*(demikian\s+(kami\s+sampaikan|disampaikan|surat|memo|memorandum)\b|atas\s+perhatian|hormat\s+kami|tembusan\s*:)",
+    re.IGNORECASE
+)
+
+def paragraph_hash(text):
+    """Hash paragraf (spasi diseragamkan) untuk penyimpanan paragraf terverifikasi."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def _is_verifiable_paragraph(line):
+    """
+    Paragraf isi yang cukup panjang dan berakhir sebagai kalimat. Potongan pendek (judul,
+    butir daftar, baris hasil pemotongan PDF) tidak pernah dicatat atau dilewati.
+    """
+    stripped = line.strip()
+    return len(stripped.split()) >= VERIFIED_MIN_WORDS and stripped.endswith((".", "?", "!"))
+
+def _is_short_line(line):
+    """Baris pendek yang bukan kalimat, misalnya nama, jabatan, alamat tujuan, atau butir tembusan."""
+    stripped = line.strip()
+    return len(stripped) <= SHORT_LINE_MAX_CHARS and not stripped.endswith((".", "?", "!"))
+
+def _is_header_field(line):
+    """Isian kop surat (Nomor:, Perihal:, Kepada Yth, dll.) yang bukan kalimat isi."""
+    stripped = line.strip()
+    return bool(HEADER_FIELD_PATTERN.match(stripped)) and (len(stripped) <= 20 or not stripped.endswith((".", "?", "!")))
+
+def _find_header_block(lines, candidates):
+    """
+    Mencari deretan isian kop yang berurutan (minimal dua isian) di awal dokumen.
+    Baris pendek di antara isian ikut dilewati; setelah isian terakhir hanya jika isian itu alamat tujuan.
+    """
+    block, pending, field_count, last_field = [], [], 0, ""
+    for i in candidates:
+        line = lines[i]
+        if _is_header_field(line):
+            block.extend(pending)
+            block.append(i)
+            pending, last_field = [], line
+            field_count += 1
+        elif block and _is_short_line(line) and len(pending) < HEADER_MAX_CONTINUATION:
+            pending.append(i)
+        elif field_count >= 2:
+            break
+        else:
+            block, pending, field_count, last_field = [], [], 0, ""
+
+    if field_count < 2:
+        return []
+    if pending and ADDRESSEE_PATTERN.match(last_field):
+        block.extend(pending)
+    return block
+
+def _find_closing_block(lines, candidates):
+    """Mencari blok penutup: rumusan penutup baku yang hanya diikuti baris pendek (tanda tangan, tembusan)."""
+    for pos, i in enumerate(candidates):
+        if not CLOSING_START_PATTERN.match(lines[i]):
+            continue
+        if all(CLOSING_START_PATTERN.match(lines[j]) or _is_short_line(lines[j]) for j in candidates[pos + 1:]):
+            return candidates[pos:]
+    return []
+
+def detect_boilerplate_lines(lines, verified_hashes):
+    """Mengembalikan dict {indeks baris: alasan} untuk baris yang tidak perlu dikirim ke AI."""
+    non_empty = [i for i, line in enumerate(lines) if line.strip()]
+    skipped = {}
+
+    for i in _find_header_block(lines, non_empty[:HEADER_SCAN_LINES]):
+        skipped[i] = "nomor surat"
+    for i in _find_closing_block(lines, non_empty[-CLOSING_SCAN_LINES:]):
+        skipped.setdefault(i, "penutup")
+
+    for i in non_empty:
+        if i not in skipped and _is_verifiable_paragraph(lines[i]) and paragraph_hash(lines[i]) in verified_hashes:
+            skipped[i] = "paragraf standar"
+    return skipped
+
+def strip_boilerplate(text, verified_hashes):
+    """
+    Membuang blok nomor surat, penutup, dan paragraf standar dari teks sebelum dikirim ke AI.
+    Temuan AI dipetakan kembali lewat teks kalimatnya (indeks penanda), bukan offset.
+    "body_lines" berisi paragraf isi (tanpa boilerplate) yang dipakai untuk mengenali dokumen.
+    """
+    lines = text.split("\n")
+    skipped_lines = detect_boilerplate_lines(lines, verified_hashes)
+    kept = [line for i, line in enumerate(lines) if i not in skipped_lines]
+    skipped = [{"line": i, "reason": reason} for i, reason in sorted(skipped_lines.items())]
+    body = [line for line in kept if _is_verifiable_paragraph(line)]
+    return {"text": "\n".join(kept), "kept_lines": kept, "body_lines": body, "skipped": skipped}
+
+def collect_clean_paragraphs(paragraphs, errors):
+    """Mengembalikan paragraf yang sudah dikirim ke AI dan tidak mengandung kesalahan apa pun."""
+    if not paragraphs:
+        return []
+
+    # Paragraf tempat kesalahan ditemukan dicari dengan indeks penanda dan kata yang salah
+    index = build_anchor_index(paragraphs)
+    flagged = set()
+    for error in errors:
+        location = locate_quote(index, error["kalimat"])
+        if location:
+            flagged.add(location["paragraph"])
+        salah = error["salah"].lower()
+        if salah:
+            flagged.update(i for i, para in enumerate(paragraphs) if salah in para.lower())
+    return [para for i, para in enumerate(paragraphs) if i not in flagged and _is_verifiable_paragraph(para)]
+
+@st.cache_resource(show_spinner=False)
+def get_verified_paragraph_store():
+    """Memuat penyimpanan hash paragraf terverifikasi (dibagi untuk semua sesi)."""
+    try:
+        with open(VERIFIED_STORE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    return {
+        "paragraphs": {
+            h: {"documents": set(entry.get("documents", [])), "last_seen": entry.get("last_seen", 0)}
+            for h, entry in data.get("paragraphs", {}).items()
+        },
+        "documents": {
+            doc_id: {"hashes": set(entry.get("hashes", [])), "last_seen": entry.get("last_seen", 0)}
+            for doc_id, entry in data.get("documents", {}).items()
+        },
+        "lock": threading.Lock(),
+    }
+
+def _serialize_verified_store(store):
+    """Salinan penyimpanan dalam bentuk yang bisa ditulis ke JSON (dipanggil di dalam lock)."""
+    return {
+        "paragraphs": {
+            h: {"documents": sorted(entry["documents"]), "last_seen": entry["last_seen"]}
+            for h, entry in store["paragraphs"].items()
+        },
+        "documents": {
+            doc_id: {"hashes": sorted(entry["hashes"]), "last_seen": entry["last_seen"]}
+            for doc_id, entry in store["documents"].items()
+        },
+    }
+
+def _write_verified_store(snapshot):
+    """
+    Menulis penyimpanan ke file secara atomik. Harus dipanggil di dalam lock agar snapshot
+    lama tidak menimpa snapshot yang lebih baru.
+    """
+    tmp_path = f"{VERIFIED_STORE_PATH}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, VERIFIED_STORE_PATH)
+    except OSError:
+        pass
+
+def _prune_verified_store(store, now):
+    """Membuang entri kedaluwarsa dan membatasi ukuran penyimpanan."""
+    cutoff = now - VERIFIED_TTL_DAYS * 24 * 3600
+    for key in ("paragraphs", "documents"):
+        entries = store[key]
+        for expired in [k for k, entry in entries.items() if entry["last_seen"] < cutoff]:
+            del entries[expired]
+
+    paragraphs = store["paragraphs"]
+    if len(paragraphs) > VERIFIED_MAX_PARAGRAPHS:
+        # Paragraf yang baru lolos di satu dokumen dibuang lebih dulu, mulai dari yang paling lama
+        ordered = sorted(paragraphs, key=lambda h: (
+            len(paragraphs[h]["documents"]) >= VERIFIED_MIN_DOCUMENTS, paragraphs[h]["last_seen"]
+        ))
+        for h in ordered[:len(paragraphs) - VERIFIED_MAX_PARAGRAPHS]:
+            del paragraphs[h]
+
+    documents = store["documents"]
+    if len(documents) > VERIFIED_MAX_DOCUMENTS:
+        ordered = sorted(documents, key=lambda doc_id: documents[doc_id]["last_seen"])
+        for doc_id in ordered[:len(documents) - VERIFIED_MAX_DOCUMENTS]:
+            del documents[doc_id]
+
+def _match_document(documents, body_hashes):
+    """
+    Mencari id dokumen tersimpan yang isinya (tanpa boilerplate) mirip dengan unggahan ini,
+    sehingga draf yang direvisi lalu diunggah ulang tetap dihitung sebagai dokumen yang sama.
+    """
+    best_id, best_similarity = None, 0.0
+    for doc_id, entry in documents.items():
+        union = len(body_hashes | entry["hashes"])
+        similarity = len(body_hashes & entry["hashes"]) / union if union else 0.0
+        if similarity > best_similarity:
+            best_id, best_similarity = doc_id, similarity
+    if best_similarity >= SAME_DOCUMENT_SIMILARITY:
+        return best_id
+    return uuid.uuid4().hex
+
+def _verified_hashes(store):
+    """Hash paragraf yang sudah lolos tanpa kesalahan di cukup banyak dokumen berbeda."""
+    return {
+        h for h, entry in store["paragraphs"].items()
+        if len(entry["documents"]) >= VERIFIED_MIN_DOCUMENTS
+    }
+
+def _update_verified_store(store, clean_paragraphs, body_paragraphs, now):
+    """Mencatat satu analisis ke penyimpanan (dipanggil di dalam lock)."""
+    body_hashes = {paragraph_hash(para) for para in body_paragraphs if _is_verifiable_paragraph(para)}
+    if not body_hashes:
+        return
+
+    doc_id = _match_document(store["documents"], body_hashes)
+    # Isi dokumen diganti dengan versi terbaru, bukan digabung, agar tidak terus membesar
+    store["documents"][doc_id] = {"hashes": body_hashes, "last_seen": now}
+
+    for para in clean_paragraphs:
+        if not _is_verifiable_paragraph(para):
+            continue
+        entry = store["paragraphs"].setdefault(paragraph_hash(para), {"documents": set(), "last_seen": now})
+        if len(entry["documents"]) < VERIFIED_MIN_DOCUMENTS:
+            entry["documents"].add(doc_id)
+        entry["last_seen"] = now
+
+    _prune_verified_store(store, now)
+
+def get_verified_hashes():
+    """Mengembalikan hash paragraf yang sudah lolos tanpa kesalahan di cukup banyak dokumen."""
+    store = get_verified_paragraph_store()
+    with store["lock"]:
+        return _verified_hashes(store)
+
+def record_verified_paragraphs(clean_paragraphs, body_paragraphs):
+    """
+    Mencatat paragraf yang lolos proofread tanpa kesalahan. Dipanggil sekali per analisis
+    dan file penyimpanan ditulis sekali setelah semua halaman selesai.
+    """
+    store = get_verified_paragraph_store()
+    with store["lock"]:
+        _update_verified_store(store, clean_paragraphs, body_paragraphs, time.time())
+        _write_verified_store(_serialize_verified_store(store))
+
+def clear_verified_paragraph_store():
+    """Menghapus seluruh riwayat paragraf standar sehingga semua paragraf dicek ulang oleh AI."""
+    store = get_verified_paragraph_store()
+    with store["lock"]:
+        store["paragraphs"].clear()
+        store["documents"].clear()
+        _write_verified_store(_serialize_verified_store(store))
+
 # --- ANTARMUKA STREAMLIT UNTUK BAGIAN 1 ---
 uploaded_file = st.file_uploader(
     "Unggah dokumen Anda yang ingin diproofread",
@@ -281,11 +790,25 @@ if uploaded_file is not None:
             if document_pages:
                 all_errors = []
                 progress_bar = st.progress(0, text="Menganalisis teks dengan AI...")
+                # Paragraf standar hanya dikenali dari paragraf DOCX utuh, bukan baris hasil pemotongan PDF
+                track_verified = uploaded_file.name.lower().endswith('.docx')
+                verified_hashes = get_verified_hashes() if track_verified else set()
+                body_paragraphs = []
+                clean_paragraphs = []
+                skipped_count = 0
+                saved_chars = 0
                 
                 for i, page in enumerate(document_pages):
                     progress_text = f"Menganalisis Bagian {i + 1}/{len(document_pages)}..."
                     progress_bar.progress((i + 1) / len(document_pages), text=progress_text)
-                    found_errors_on_page = proofread_with_gemini(page['teks'])
+                    filtered_page = strip_boilerplate(page['teks'], verified_hashes)
+                    body_paragraphs.extend(filtered_page["body_lines"])
+                    skipped_count += len(filtered_page["skipped"])
+                    saved_chars += len(page['teks']) - len(filtered_page["text"])
+                    found_errors_on_page = proofread_with_gemini(filtered_page["text"])
+                    if found_errors_on_page is None:
+                        continue
+                    clean_paragraphs.extend(collect_clean_paragraphs(filtered_page["kept_lines"], found_errors_on_page))
                     
                     for error in found_errors_on_page:
                         all_errors.append({
@@ -295,11 +818,18 @@ if uploaded_file is not None:
                             "Ditemukan di Halaman": page['halaman']
                         })
                 progress_bar.empty()
+                if track_verified:
+                    record_verified_paragraphs(clean_paragraphs, body_paragraphs)
                 st.session_state.analysis_results = all_errors
+                st.session_state.boilerplate_summary = (skipped_count, saved_chars)
 
 if st.session_state.analysis_results is not None:
     all_errors = st.session_state.analysis_results
 
+    skipped_count, saved_chars = st.session_state.get('boilerplate_summary', (0, 0))
+    if skipped_count:
+        st.caption(f"{skipped_count} paragraf (nomor surat, penutup, dan paragraf standar) tidak dikirim ke AI, menghemat {saved_chars} karakter.")
+
     if not all_errors:
         st.success("Tidak ada kesalahan ejaan atau ketik yang ditemukan dalam dokumen.")
     else:
@@ -346,6 +876,13 @@ if st.session_state.analysis_results is not None:
                 )
     st.warning("Harap lakukan analisis ulang jika muncul pesan bahwa tidak ada ejaan yang salah karena model bisa saja tidak berhasil mendeteksi.")
 
+with st.expander("Riwayat Paragraf Standar"):
+    st.caption("Paragraf standar yang sudah lolos proofread di beberapa dokumen tidak dikirim lagi ke AI. Riwayat ini dipakai bersama oleh semua pengguna.")
+    confirm_clear = st.checkbox("Saya yakin ingin menghapus riwayat untuk semua pengguna", key="confirm_clear_verified_store")
+    if st.button("Hapus Riwayat Paragraf Standar", key="clear_verified_store", disabled=not confirm_clear):
+        clear_verified_paragraph_store()
+        st.success("Riwayat paragraf standar telah dihapus. Semua paragraf akan dicek ulang oleh AI pada analisis berikutnya.")
+
 st.divider()
 st.markdown("<a id='bagian2'></a>", unsafe_allow_html=True)
 st.markdown('### 2. Bandingkan Dokumen <b style="color:green;">(Available)</b>', unsafe_allow_html=True)
@@ -574,6 +1111,20 @@ if 'coherence_results' in st.session_state:
         # PASTIKAN BARIS INI BERADA DI DALAM BLOK 'else'
         st.dataframe(df_coherence, use_container_width=True)
 
+        if coherence_file and coherence_file.name.endswith('.docx'):
+            highlighted_docx_data, located_count = create_anchor_highlight_docx(
+                coherence_file.getvalue(), [issue.get("asli") for issue in results]
+            )
+            st.caption(f"{located_count} dari {len(results)} teks asli berhasil ditandai di dokumen.")
+            st.download_button(
+                label="Unduh Dokumen dengan Highlight",
+                data=highlighted_docx_data,
+                file_name=f"highlight_koherensi_{coherence_file.name}",
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                use_container_width=True,
+                key="coherence_highlight_download"
+            )
+
 #Bagian 4 : Restrukturisasi Koherensi Dokumen
 st.divider()
 st.markdown("<a id='bagian4'></a>", unsafe_allow_html=True)
@@ -626,18 +1177,8 @@ def create_recommendation_highlight_docx(file_bytes, recommendations):
     """
     Membuat file DOCX asli dengan highlight pada paragraf yang disarankan untuk dipindahkan.
     """
-    doc = docx.Document(io.BytesIO(file_bytes))
-
     misplaced_paragraphs = [rec.get("Paragraf yang Perlu Dipindah") for rec in recommendations]
-
-    for para in doc.paragraphs:
-        if para.text.strip() in [p.strip() for p in misplaced_paragraphs if p]:
-            for run in para.runs:
-                run.font.highlight_color = WD_COLOR_INDEX.YELLOW
-            
-    output_buffer = io.BytesIO()
-    doc.save(output_buffer)
-    return output_buffer.getvalue()
+    return create_anchor_highlight_docx(file_bytes, misplaced_paragraphs)
 
 recommendation_file = st.file_uploader(
     "Unggah Dokumen Anda disini",
@@ -675,7 +1216,8 @@ if 'recommendations' in st.session_state and st.session_state.recommendations is
         st.dataframe(df_recommendations, use_container_width=True)
         
         if recommendation_file and recommendation_file.name.endswith('.docx'):
-            highlighted_docx_data = create_recommendation_highlight_docx(recommendation_file.getvalue(), results)
+            highlighted_docx_data, located_count = create_recommendation_highlight_docx(recommendation_file.getvalue(), results)
+            st.caption(f"{located_count} dari {len(results)} paragraf berhasil ditandai di dokumen.")
             st.download_button(
                 label="Unduh Dokumen dengan Highlight",
                 data=highlighted_docx_data,
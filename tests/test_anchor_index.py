@@ -0,0 +1,136 @@
+"""Tes indeks penanda (anchor) untuk memetakan kutipan AI ke paragraf dokumen.
+
+app.py langsung menjalankan antarmuka Streamlit saat di-import, jadi tes ini hanya
+memuat konstanta dan fungsi murni yang dibutuhkan dari source app.py.
+"""
+import ast
+import bisect
+import copy
+import difflib
+import heapq
+import pathlib
+import re
+import unicodedata
+from collections import defaultdict
+
+import pytest
+
+docx = pytest.importorskip("docx")
+from docx.enum.text import WD_COLOR_INDEX  # noqa: E402
+from docx.oxml import OxmlElement  # noqa: E402
+from docx.oxml.ns import qn  # noqa: E402
+from docx.text.run import Run  # noqa: E402
+
+APP_PATH = pathlib.Path(__file__).resolve().parent.parent / "app.py"
+FUNCTIONS = {
+    "normalize_with_map",
+    "_char_ngrams",
+    "_minhash_signature",
+    "_lsh_keys",
+    "paragraph_run_text",
+    "build_anchor_index",
+    "_align_span",
+    "locate_quote",
+    "_is_plain_text_run",
+    "_split_run",
+    "highlight_paragraph_span",
+}
+CONSTANT_PREFIXES = ("ANCHOR_", "PLAIN_RUN_")
+
+
+def _load_app_helpers():
+    namespace = {
+        "re": re, "bisect": bisect, "copy": copy, "difflib": difflib, "heapq": heapq,
+        "unicodedata": unicodedata, "defaultdict": defaultdict,
+        "Run": Run, "qn": qn, "WD_COLOR_INDEX": WD_COLOR_INDEX,
+    }
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    for node in tree.body:
+        is_constant = (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id.startswith(CONSTANT_PREFIXES)
+        )
+        if is_constant or (isinstance(node, ast.FunctionDef) and node.name in FUNCTIONS):
+            exec(compile(ast.Module([node], []), str(APP_PATH), "exec"), namespace)
+    return namespace
+
+
+app = _load_app_helpers()
+
+PARAGRAPHS = [
+    "Latar Belakang",
+    "Satuan Kerja Audit Internal melakukan reviu atas proses pengadaan barang dan jasa. "
+    "Selain itu, audit internal juga memeriksa laporan keuangan setiap kuartal. "
+    "Hasil reviu disampaikan kepada Direksi.",
+    "Sistem whistleblowing perusahaan menerima laporan dari karyawan maupun pihak eksternal.",
+    "Rencana Kerja dan Anggaran Tahunan (RKAT) disusun setiap akhir tahun oleh unit terkait.",
+]
+
+
+def _located_text(quote):
+    location = app["locate_quote"](app["build_anchor_index"](PARAGRAPHS), quote)
+    assert location is not None
+    return location["paragraph"], PARAGRAPHS[location["paragraph"]][location["start"]:location["end"]]
+
+
+def test_exact_sentence_inside_long_paragraph():
+    paragraph, text = _located_text("Selain itu, audit internal juga memeriksa laporan keuangan setiap kuartal.")
+    assert paragraph == 1
+    assert text == "Selain itu, audit internal juga memeriksa laporan keuangan setiap kuartal"
+
+
+def test_fuzzy_quote_resolves_to_paragraph_and_span():
+    paragraph, text = _located_text("selain itu audit internal juga memerikas laporan keuangan tiap kuartal...")
+    assert paragraph == 1
+    assert text.startswith("Selain itu, audit internal")
+    assert text.endswith("kuartal")
+
+
+def test_unrelated_quote_returns_none():
+    index = app["build_anchor_index"](PARAGRAPHS)
+    assert app["locate_quote"](index, "Pembangunan jembatan baru di Kalimantan Timur ditunda.") is None
+
+
+@pytest.mark.parametrize("quote", [None, "", "   ", "..."])
+def test_empty_quote_returns_none(quote):
+    index = app["build_anchor_index"](PARAGRAPHS)
+    assert app["locate_quote"](index, quote) is None
+
+
+def _paragraph_with_runs(*texts):
+    para = docx.Document().add_paragraph()
+    for text in texts:
+        para.add_run(text)
+    return para
+
+
+def _highlight_quotes(para, quotes):
+    index = app["build_anchor_index"]([app["paragraph_run_text"](para)])
+    for quote in quotes:
+        location = app["locate_quote"](index, quote)
+        app["highlight_paragraph_span"](para, location["start"], location["end"])
+
+
+def test_two_quotes_in_same_paragraph_keep_text_intact():
+    para = _paragraph_with_runs("Satuan Kerja Audit Internal melakukan reviu. ", "Hasil reviu disampaikan kepada Direksi.")
+    original = app["paragraph_run_text"](para)
+    _highlight_quotes(para, ["melakukan reviu", "disampaikan kepada Direksi"])
+
+    assert "".join(run.text for run in para.runs) == original
+    highlighted = [run.text for run in para.runs if run.font.highlight_color == WD_COLOR_INDEX.YELLOW]
+    assert highlighted == ["melakukan reviu", "disampaikan kepada Direksi"]
+
+
+def test_run_with_field_code_is_highlighted_whole_not_split():
+    para = _paragraph_with_runs("Lihat ", "halaman berikut untuk rincian.")
+    field_char = OxmlElement("w:fldChar")
+    field_char.set(qn("w:fldCharType"), "begin")
+    para.runs[1]._r.append(field_char)
+
+    _highlight_quotes(para, ["halaman berikut"])
+
+    assert len(para.runs) == 2
+    assert para.runs[1].font.highlight_color == WD_COLOR_INDEX.YELLOW
+    assert para.runs[1]._r.find(qn("w:fldChar")) is not None
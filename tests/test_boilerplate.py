@@ -0,0 +1,230 @@
+"""Tes deteksi boilerplate (nomor surat, penutup) dan penyimpanan paragraf standar.
+
+app.py langsung menjalankan antarmuka Streamlit saat di-import, jadi tes ini hanya
+memuat konstanta dan fungsi murni yang dibutuhkan dari source app.py.
+"""
+import ast
+import hashlib
+import pathlib
+import re
+import uuid
+
+APP_PATH = pathlib.Path(__file__).resolve().parent.parent / "app.py"
+FUNCTIONS = {
+    "paragraph_hash",
+    "_is_short_line",
+    "_is_header_field",
+    "_find_header_block",
+    "_find_closing_block",
+    "detect_boilerplate_lines",
+    "strip_boilerplate",
+    "_prune_verified_store",
+    "_match_document",
+    "_is_verifiable_paragraph",
+    "_verified_hashes",
+    "_update_verified_store",
+}
+CONSTANT_PREFIXES = ("VERIFIED_", "SAME_DOCUMENT_", "HEADER_", "ADDRESSEE_", "CLOSING_", "SHORT_LINE_")
+
+
+def _load_app_helpers():
+    namespace = {"re": re, "hashlib": hashlib, "uuid": uuid}
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    for node in tree.body:
+        is_constant = (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id.startswith(CONSTANT_PREFIXES)
+        )
+        if is_constant or (isinstance(node, ast.FunctionDef) and node.name in FUNCTIONS):
+            exec(compile(ast.Module([node], []), str(APP_PATH), "exec"), namespace)
+    return namespace
+
+
+app = _load_app_helpers()
+
+
+def _reasons(text, verified_hashes=frozenset()):
+    lines = text.split("\n")
+    return {lines[i]: reason for i, reason in app["detect_boilerplate_lines"](lines, verified_hashes).items()}
+
+
+MEMO = """MEMORANDUM
+Nomor: 123/IFG/SKAI/2026
+Kepada Yth.
+Direktur Utama
+Dari: Kepala SKAI
+Perihal: Laporan Audit
+
+Audit atas proses pengadaan telah selesai dilaksanakan pada bulan Maret.
+Demikian disampaikan, atas perhatiannya diucapkan terima kasih.
+Hormat kami,
+Yullyan
+Tembusan:
+1. Direksi"""
+
+
+def test_letter_number_and_closing_blocks_are_skipped():
+    reasons = _reasons(MEMO)
+    assert reasons["Nomor: 123/IFG/SKAI/2026"] == "nomor surat"
+    assert reasons["Direktur Utama"] == "nomor surat"
+    assert reasons["Perihal: Laporan Audit"] == "nomor surat"
+    assert reasons["Demikian disampaikan, atas perhatiannya diucapkan terima kasih."] == "penutup"
+    assert reasons["1. Direksi"] == "penutup"
+    assert "MEMORANDUM" not in reasons
+    assert "Audit atas proses pengadaan telah selesai dilaksanakan pada bulan Maret." not in reasons
+
+
+def test_demikian_transition_phrases_are_not_closing():
+    text = """Nomor: 45/IFG/2026
+Perihal: Rekonsiliasi
+Proses pencatatan transaksi sudah sesuai dengan kebijakan perusahaan.
+Demikian pula, proses rekonsiliasi bank dilakukan setiap akhir bulan.
+Selisih yang ditemukan telah ditindaklanjuti oleh unit terkait.
+Demikian juga dengan pencatatan aset tetap yang sudah diperbarui.
+Demikian halnya laporan kas kecil yang telah diverifikasi.
+Tim akan memantau tindak lanjut pada kuartal berikutnya.
+Hormat kami,
+Yullyan"""
+    reasons = _reasons(text)
+    assert "Demikian pula, proses rekonsiliasi bank dilakukan setiap akhir bulan." not in reasons
+    assert "Demikian juga dengan pencatatan aset tetap yang sudah diperbarui." not in reasons
+    assert "Demikian halnya laporan kas kecil yang telah diverifikasi." not in reasons
+    assert "Tim akan memantau tindak lanjut pada kuartal berikutnya." not in reasons
+    assert reasons["Hormat kami,"] == "penutup"
+
+
+def test_body_sentence_after_closing_formula_cancels_closing_block():
+    text = """Isi memo yang perlu diperiksa.
+Atas perhatian tim, berikut kami sampaikan temuan tambahan dari hasil pemeriksaan lapangan.
+Temuan tersebut perlu ditindaklanjuti paling lambat minggu depan oleh unit terkait."""
+    assert _reasons(text) == {}
+
+
+def test_body_lines_starting_with_field_names_are_not_header():
+    text = """Tanggal: 5 Maret 2026
+Pemeriksaan dilakukan terhadap seluruh transaksi pengadaan tahun berjalan.
+Sebagian besar transaksi sudah didukung dokumen yang lengkap dan sah.
+Dari: data keuangan, terlihat penurunan.
+Hal: ini perlu menjadi perhatian manajemen."""
+    assert _reasons(text) == {}
+
+
+def test_verified_paragraph_hash_is_skipped():
+    disclaimer = "Informasi ini bersifat rahasia dan hanya untuk penerima."
+    reasons = _reasons("Isi memo.\n" + disclaimer, {app["paragraph_hash"](disclaimer)})
+    assert reasons == {disclaimer: "paragraf standar"}
+
+
+def test_short_fragments_are_never_skipped_as_verified():
+    fragments = ["perusahaan.", "dan", "1.", "Rp", "Latar Belakang"]
+    verified = {app["paragraph_hash"](fragment) for fragment in fragments}
+    assert _reasons("\n".join(fragments), verified) == {}
+
+
+def test_strip_boilerplate_keeps_body_only():
+    result = app["strip_boilerplate"](MEMO, frozenset())
+    assert "Nomor:" not in result["text"]
+    assert "Hormat kami" not in result["text"]
+    assert "Audit atas proses pengadaan" in result["text"]
+    assert {"line": 1, "reason": "nomor surat"} in result["skipped"]
+
+
+def test_revised_draft_is_matched_to_same_document():
+    draft = {f"p{i}" for i in range(10)}
+    documents = {"draft": {"hashes": draft, "last_seen": 0}}
+    revised = (draft - {"p3"}) | {"p3-fixed"}
+    assert app["_match_document"](documents, revised) == "draft"
+    other_memo = {"p0", "p1"} | {f"q{i}" for i in range(10)}
+    assert app["_match_document"](documents, other_memo) != "draft"
+
+
+def test_prune_drops_expired_and_single_document_entries_first():
+    day = 24 * 3600
+    now = 1000 * day
+    store = {
+        "paragraphs": {
+            "expired": {"documents": {"a", "b"}, "last_seen": now - (app["VERIFIED_TTL_DAYS"] + 1) * day},
+            "verified": {"documents": {"a", "b"}, "last_seen": now - 10 * day},
+            "single-old": {"documents": {"a"}, "last_seen": now - 5 * day},
+            "single-new": {"documents": {"a"}, "last_seen": now},
+        },
+        "documents": {},
+    }
+    max_paragraphs = app["VERIFIED_MAX_PARAGRAPHS"]
+    app["VERIFIED_MAX_PARAGRAPHS"] = 2
+    try:
+        app["_prune_verified_store"](store, now)
+    finally:
+        app["VERIFIED_MAX_PARAGRAPHS"] = max_paragraphs
+    assert set(store["paragraphs"]) == {"verified", "single-new"}
+
+
+DISCLAIMER = "Informasi dalam memo ini bersifat rahasia dan hanya ditujukan kepada penerima."
+
+
+def _memo(body):
+    return "\n".join([
+        "MEMORANDUM",
+        "Nomor: 10/IFG/SKAI/2026",
+        "Kepada Yth.",
+        "Direktur Utama",
+        "Dari: Kepala SKAI",
+        "Perihal: Laporan Bulanan",
+        *body,
+        DISCLAIMER,
+        "Demikian disampaikan, atas perhatiannya diucapkan terima kasih.",
+        "Hormat kami,",
+        "Yullyan",
+        "Tembusan:",
+        "1. Direksi",
+    ])
+
+
+def _record(store, text, now):
+    filtered = app["strip_boilerplate"](text, app["_verified_hashes"](store))
+    # Anggap AI tidak menemukan kesalahan: semua paragraf isi yang dikirim lolos
+    app["_update_verified_store"](store, filtered["kept_lines"], filtered["body_lines"], now)
+    return filtered
+
+
+def _empty_store():
+    return {"paragraphs": {}, "documents": {}}
+
+
+def test_shared_disclaimer_becomes_verified_across_different_memos():
+    store = _empty_store()
+    _record(store, _memo([
+        "Audit atas proses pengadaan barang dan jasa telah selesai dilaksanakan pada bulan Maret.",
+        "Seluruh temuan pengadaan sudah disampaikan kepada unit terkait untuk ditindaklanjuti.",
+    ]), now=1)
+    _record(store, _memo([
+        "Reviu atas laporan keuangan kuartal pertama menunjukkan beberapa selisih pencatatan kas.",
+        "Unit keuangan diminta melakukan rekonsiliasi ulang sebelum akhir bulan berjalan ini.",
+    ]), now=2)
+
+    assert len(store["documents"]) == 2
+    assert app["paragraph_hash"](DISCLAIMER) in app["_verified_hashes"](store)
+
+    filtered = _record(store, _memo([
+        "Pemeriksaan aset tetap di kantor cabang Surabaya dijadwalkan pada minggu depan.",
+    ]), now=3)
+    assert DISCLAIMER not in filtered["text"]
+    assert [item["reason"] for item in filtered["skipped"]].count("paragraf standar") == 1
+
+
+def test_reanalysing_revised_draft_does_not_verify_its_paragraphs():
+    body = [
+        "Audit atas proses pengadaan barang dan jasa telah selesai dilaksanakan pada bulan Maret.",
+        "Seluruh temuan pengadaan sudah disampaikan kepada unit terkait untuk ditindaklanjuti.",
+        "Tim audit merekomendasikan pembaruan prosedur verifikasi dokumen vendor baru.",
+    ]
+    store = _empty_store()
+    _record(store, _memo(body), now=1)
+    revised = body[:2] + ["Tim audit merekomendasikan pembaruan prosedur verifikasi dokumen vendor yang baru."]
+    _record(store, _memo(revised), now=2)
+    _record(store, _memo(revised), now=3)
+
+    assert len(store["documents"]) == 1
+    assert app["_verified_hashes"](store) == set()